@@ -0,0 +1,251 @@
+# Copyright 2026 MADTEC-2025-M-478 Project Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     [http://www.apache.org/licenses/LICENSE-2.0](http://www.apache.org/licenses/LICENSE-2.0)
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import aiohttp
+from option import Result,Ok,Err
+from jub.dto import Observatory, Catalog, Product, ProductFilter, LevelCatalog
+from jub.dto import parse_observatories, parse_catalogs, parse_products, dump_products, dump_level_catalogs
+from jub.utils import JubEndpoints, gen_id, with_observatory_defaults, check_async_response, JSON_HEADERS
+from typing import List,Optional
+import time as T
+from jub.log import Log
+import logging
+import jub.config as CX
+log = Log(
+    name                   = __name__ ,
+    path                   = CX.JUB_CLIENT_LOG_PATH ,
+    file_handler_filter    = lambda record: record.levelno == logging.INFO
+)
+
+
+class AsyncJubClient(JubEndpoints):
+    """Asynchronous counterpart of JubClient, it must be used as an async context manager:
+
+        async with AsyncJubClient(hostname="localhost", port=5000) as client:
+            results = await client.delete_products(pids)
+    """
+
+    def __init__(self,hostname:str, port:int=-1, max_concurrency:int=32):
+        super().__init__(hostname=hostname, port=port)
+        self.max_concurrency = max_concurrency
+        self._s:aiohttp.ClientSession = None
+        self._sem:asyncio.Semaphore = None
+
+    async def __aenter__(self):
+        self._s   = aiohttp.ClientSession(
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency),
+            headers   = {"Accept": "application/json"}
+        )
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        if self._s is not None:
+            await self._s.close()
+            self._s = None
+
+    def _ensure_open(self):
+        # Without this, every call would come back as Err(AttributeError) on the missing session
+        if self._s is None:
+            raise RuntimeError("AsyncJubClient must be used as an async context manager")
+
+    async def _gather(self, coros)->list:
+        self._ensure_open()
+        async def run(coro):
+            async with self._sem:
+                return await coro
+        return await asyncio.gather(*(run(coro) for coro in coros))
+
+    async def create_observatory(self, observatory:Observatory)->Result[str,Exception]:
+        self._ensure_open()
+        try:
+            observatory = with_observatory_defaults(observatory)
+            async with self._s.post(self.observatories_url,data=observatory.model_dump_json().encode(),headers=JSON_HEADERS) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+            return Ok(observatory.obid)
+        except Exception as e:
+            return Err(e)
+
+    async def delete_observatory(self,obid:str)->Result[str,Exception]:
+        self._ensure_open()
+        url = self._obs_tpl % obid
+        try:
+            async with self._s.delete(url) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+            return Ok(obid)
+        except Exception as e:
+            return Err(e)
+
+    async def update_observatory_catalogs(self,obid:str, catalogs:Optional[List[LevelCatalog]]=None)->Result[str,Exception]:
+        self._ensure_open()
+        catalogs = [] if catalogs is None else catalogs
+        try:
+            url = self._obs_tpl % obid
+            async with self._s.post(url, data=dump_level_catalogs(catalogs), headers=JSON_HEADERS) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+            return Ok(obid)
+        except Exception as e:
+            return Err(e)
+
+    async def get_observatory(self,obid:str)->Result[Observatory, Exception]:
+        self._ensure_open()
+        url = self._obs_tpl % obid
+        try:
+            async with self._s.get(url) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+                data = await response.read()
+            return Ok(Observatory.model_validate_json(data))
+        except Exception as e:
+            return Err(e)
+
+    async def get_observatories(self,skip:int=0,limit:int=10)->Result[List[Observatory],Exception]:
+        self._ensure_open()
+        try:
+            async with self._s.get(self.observatories_url, params={"skip":skip,"limit":limit}) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+                data = await response.read()
+            observatories = parse_observatories(data)
+            return Ok(observatories)
+        except Exception as e:
+            return Err(e)
+
+    async def get_observatories_by_ids(self,obids:List[str])->List[Result[Observatory,Exception]]:
+        return await self._gather(self.get_observatory(obid) for obid in obids)
+
+    async def create_catalog(self,catalog:Catalog)->Result[str,Exception]:
+        self._ensure_open()
+        try:
+            if catalog.cid == "":
+                catalog = catalog.model_copy(update={"cid": gen_id()})
+            async with self._s.post(self.catalogs_url,data=catalog.model_dump_json().encode(),headers=JSON_HEADERS) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+            return Ok(catalog.cid)
+        except Exception as e:
+            return Err(e)
+
+    async def delete_catalog(self,cid:str)->Result[str,Exception]:
+        self._ensure_open()
+        try:
+            url = self._cat_tpl % cid
+            async with self._s.delete(url) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+            return Ok(cid)
+        except Exception as e:
+            return Err(e)
+
+    async def get_catalog(self,cid:str)->Result[Catalog,Exception]:
+        self._ensure_open()
+        try:
+            url = self._cat_tpl % cid
+            async with self._s.get(url) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+                data = await response.read()
+            return Ok(Catalog.model_validate_json(data))
+        except Exception as e:
+            return Err(e)
+
+    async def get_catalogs(self)->Result[List[Catalog],Exception]:
+        self._ensure_open()
+        try:
+            t1 = T.perf_counter_ns()
+            async with self._s.get(self.catalogs_url) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+                data = await response.read()
+            catalogs = parse_catalogs(data)
+            t2 = T.perf_counter_ns()
+            if log.isEnabledFor(logging.INFO):
+                log.info({
+                    "event":"GET.CATALOGS",
+                    "url":self.catalogs_url,
+                    "response_time":(t2 - t1)/1e9
+                })
+            return Ok(catalogs)
+        except Exception as e:
+            return Err(e)
+
+    async def get_products(self,skip:int = 0, limit:int = 10)->Result[List[Product],Exception]:
+        self._ensure_open()
+        try:
+            async with self._s.get(self.products_url, params={"skip":skip,"limit":limit}) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+                data = await response.read()
+            products = parse_products(data)
+            return Ok(products)
+        except Exception as e:
+            return Err(e)
+
+    async def query_products(self,obid:str, filter:ProductFilter ,skip:int = 0, limit:int = 100 ):
+        self._ensure_open()
+        try:
+            url = self._query_tpl % obid
+            async with self._s.post(url, data=filter.model_dump_json().encode(), headers=JSON_HEADERS) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+                data = await response.read()
+            products = parse_products(data)
+            return Ok(products)
+        except Exception as e:
+            return Err(e)
+
+    async def create_products(self,products:Optional[List[Product]]=None)->Result[bool, Exception]:
+        self._ensure_open()
+        products = [] if products is None else products
+        try:
+            async with self._s.post(self.products_url,data=dump_products(products),headers=JSON_HEADERS) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+            return Ok(True)
+        except Exception as e:
+            return Err(e)
+
+    async def delete_product(self,pid:str)->Result[str,Exception]:
+        self._ensure_open()
+        try:
+            url = self._prod_tpl % pid
+            async with self._s.delete(url) as response:
+                err = check_async_response(response)
+                if err:
+                    return Err(err)
+            return Ok(pid)
+        except Exception as e:
+            return Err(e)
+
+    async def delete_products(self,pids:List[str])->List[Result[str,Exception]]:
+        return await self._gather(self.delete_product(pid) for pid in pids)
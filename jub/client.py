@@ -14,14 +14,25 @@
 # limitations under the License.
 
 import requests as R
-from nanoid import generate as nanoid
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from option import Result,Ok,Err
 from jub.dto import Observatory, Catalog, Product, ProductFilter, LevelCatalog
-from typing import List
+from jub.dto import parse_observatories, parse_catalogs, parse_products, dump_products, dump_level_catalogs
+from typing import List,Dict,Tuple,Optional,Iterator
+from jub.utils import JubEndpoints, gen_id, with_observatory_defaults, check_response, JSON_HEADERS
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from cachetools import TTLCache
 import time as T
 from jub.log import Log 
 import logging
 import jub.config as CX
+try:
+    import ijson
+except ImportError:
+    # Without ijson, iter_products decodes the whole response before yielding
+    ijson = None
 log = Log(
     name                   = __name__ ,
     path                   = CX.JUB_CLIENT_LOG_PATH ,
@@ -29,75 +40,136 @@ log = Log(
 )
 
 
-class JubClient(object):
+class JubClient(JubEndpoints):
     
-    def __init__(self,hostname:str, port:int=-1):
-        self.base_url = "https://{}".format(hostname) if port == -1 else "http://{}:{}".format(hostname,port)
-        self.observatories_url = "{}/observatories".format(self.base_url)
-        self.catalogs_url = "{}/catalogs".format(self.base_url)
-        self.products_url = "{}/products".format(self.base_url)
+    def __init__(self,hostname:str, port:int=-1, cache_maxsize:int=1024, cache_ttl:float=60):
+        super().__init__(hostname=hostname, port=port)
+        # A single session keeps the TCP/TLS connections to the host alive between calls
+        self._s = R.Session()
+        adapter = HTTPAdapter(
+            pool_connections = 4,
+            pool_maxsize     = 32,
+            max_retries      = Retry(total=3, backoff_factor=0.2, status_forcelist=[502,503,504])
+        )
+        self._s.mount("http://", adapter)
+        self._s.mount("https://", adapter)
+        # requests already advertises gzip/deflate, responses are validated straight from the decoded bytes
+        self._s.headers.update({"Accept": "application/json"})
+        # Observatories and catalogs are read-mostly, so get_observatory/get_catalog keep them for cache_ttl seconds.
+        # Every write through this client evicts the affected id. Set cache_ttl=0 to always hit the server.
+        # Cached models are shared by every caller, the models are frozen but their catalogs/items/metadata containers
+        # are plain lists and dicts, so they must be treated as read-only (copy them before changing anything).
+        self._obs_cache:TTLCache = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        self._cat_cache:TTLCache = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        # Write generation per id (one int per id written through this client),
+        # a get only caches its result if no write on that id started or ended meanwhile
+        self._obs_gen:Dict[str,int] = {}
+        self._cat_gen:Dict[str,int] = {}
+        self._cache_lock = Lock()
+
+    def close(self):
+        self._s.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _cache_get(self, cache:TTLCache, gens:Dict[str,int], key:str)->Tuple[object,int]:
+        with self._cache_lock:
+            return cache.get(key), gens.get(key, 0)
+
+    def _cache_set(self, cache:TTLCache, gens:Dict[str,int], key:str, value, generation:int):
+        with self._cache_lock:
+            # A write on key ran while this value was being fetched, so it may already be stale
+            if gens.get(key, 0) == generation:
+                cache[key] = value
+
+    def _cache_invalidate(self, cache:TTLCache, gens:Dict[str,int], key:str):
+        # Called before and after each write, gets that overlap the write never cache their result
+        with self._cache_lock:
+            gens[key] = gens.get(key, 0) + 1
+            cache.pop(key, None)
 
     def create_observatory(self, observatory:Observatory)->Result[str,Exception]:
         try:
-            # Server side validation for image_url and obid
-            if observatory.image_url == "":
-                observatory.image_url = "https://ivoice.live/wp-content/uploads/2019/12/no-image-1.jpg"
-                
-            if observatory.obid == "":
-                observatory.obid = nanoid(alphabet=CX.JUB_CLIENT_OBSERVATORY_ID_ALPHABET, size=CX.JUB_CLIENT_OBSERVATORY_ID_SIZE)
+            observatory = with_observatory_defaults(observatory)
+            self._cache_invalidate(self._obs_cache, self._obs_gen, observatory.obid)
             # 
-            response = R.post(self.observatories_url,json=observatory.model_dump())
+            try:
+                response = self._s.post(self.observatories_url,data=observatory.model_dump_json().encode(),headers=JSON_HEADERS)
+            finally:
+                self._cache_invalidate(self._obs_cache, self._obs_gen, observatory.obid)
             # 
-            response.raise_for_status()
+            err = check_response(response)
+            if err:
+                return Err(err)
             
             return Ok(observatory.obid)
         except Exception as e:
             return Err(e)
 
+    def create_observatories_bulk(self, observatories:List[Observatory], workers:int=16)->List[Result[str,Exception]]:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.create_observatory, observatories))
+
     def delete_observatory(self,obid:str)->Result[str,Exception]:
-        url = "{}/{}".format(self.observatories_url,obid)
+        url = self._obs_tpl % obid
         try:
-            response = R.delete(url=url)
-            response.raise_for_status()
+            self._cache_invalidate(self._obs_cache, self._obs_gen, obid)
+            try:
+                response = self._s.delete(url=url)
+            finally:
+                self._cache_invalidate(self._obs_cache, self._obs_gen, obid)
+            err = check_response(response)
+            if err:
+                return Err(err)
             return Ok(obid)
         except Exception as e:
             return Err(e)
     
-    def update_observatory_catalogs(self,obid:str, catalogs:List[LevelCatalog]=[])->Result[str,Exception]:
+    def update_observatory_catalogs(self,obid:str, catalogs:Optional[List[LevelCatalog]]=None)->Result[str,Exception]:
+        catalogs = [] if catalogs is None else catalogs
         try:
-            url = "{}/{}".format(self.observatories_url,obid)
-            _catalogs = list(map(lambda x: x.model_dump() , catalogs))
-            response = R.post(url=url, json=_catalogs )
-            response.raise_for_status()
+            url = self._obs_tpl % obid
+            self._cache_invalidate(self._obs_cache, self._obs_gen, obid)
+            try:
+                response = self._s.post(url=url, data=dump_level_catalogs(catalogs), headers=JSON_HEADERS)
+            finally:
+                self._cache_invalidate(self._obs_cache, self._obs_gen, obid)
+            err = check_response(response)
+            if err:
+                return Err(err)
             return Ok(obid)
         except Exception as e:
             return Err(e)
           
     def get_observatory(self,obid:str)->Result[Observatory, Exception]:
-        url = "{}/{}".format(self.observatories_url,obid)
+        url = self._obs_tpl % obid
         try:
-            response = R.get(url=url)
-            response.raise_for_status()
-            data = response.json()
-            print(data)
-            return Ok(Observatory(
-                obid= data["obid"],
-                title= data["title"],
-                catalogs=list(map(lambda x: LevelCatalog(**x),data["catalogs"])),
-                description=data["description"],
-                image_url=data["image_url"]
-            ))
+            observatory, generation = self._cache_get(self._obs_cache, self._obs_gen, obid)
+            if observatory is not None:
+                return Ok(observatory)
+            response = self._s.get(url=url)
+            err = check_response(response)
+            if err:
+                return Err(err)
+            data = response.content
+            observatory = Observatory.model_validate_json(data)
+            self._cache_set(self._obs_cache, self._obs_gen, obid, observatory, generation)
+            return Ok(observatory)
         except Exception as e:
             return Err(e)
     
     def get_observatories(self,skip:int=0,limit:int=10)->Result[List[Observatory],Exception]:
         try:
-            url = "{}?skip={}&limit={}".format(self.observatories_url,skip,limit)
-            response = R.get(url=url)
-            response.raise_for_status()
-            data = response.json()
-            print(data)
-            observatories = list(map(lambda x: Observatory(**x), data))
+            response = self._s.get(url=self.observatories_url, params={"skip":skip,"limit":limit})
+            err = check_response(response)
+            if err:
+                return Err(err)
+            data = response.content
+            observatories = parse_observatories(data)
             return Ok(observatories)
         except Exception as e:
             return Err(e)
@@ -105,95 +177,137 @@ class JubClient(object):
     def create_catalog(self,catalog:Catalog)->Result[str,Exception]:
         try:
             if catalog.cid == "":
-                catalog.cid = nanoid(alphabet=CX.JUB_CLIENT_OBSERVATORY_ID_ALPHABET, size=CX.JUB_CLIENT_OBSERVATORY_ID_SIZE)
-            data = catalog.model_dump()
-            response = R.post(url=self.catalogs_url,json=data)
-            response.raise_for_status()
+                catalog = catalog.model_copy(update={"cid": gen_id()})
+            data = catalog.model_dump_json().encode()
+            self._cache_invalidate(self._cat_cache, self._cat_gen, catalog.cid)
+            try:
+                response = self._s.post(url=self.catalogs_url,data=data,headers=JSON_HEADERS)
+            finally:
+                self._cache_invalidate(self._cat_cache, self._cat_gen, catalog.cid)
+            err = check_response(response)
+            if err:
+                return Err(err)
             return Ok(catalog.cid)
         except Exception as e:
             return Err(e)
         
     def delete_catalog(self,cid:str)->Result[str,Exception]:
         try:
-            url = "{}/{}".format(self.catalogs_url,cid)
-            response = R.delete(url=url)
-            response.raise_for_status()
+            url = self._cat_tpl % cid
+            self._cache_invalidate(self._cat_cache, self._cat_gen, cid)
+            try:
+                response = self._s.delete(url=url)
+            finally:
+                self._cache_invalidate(self._cat_cache, self._cat_gen, cid)
+            err = check_response(response)
+            if err:
+                return Err(err)
             return Ok(cid)
         except Exception as e:
             return Err(e)
     
     def get_catalog(self,cid:str)->Result[Catalog,Exception]:
         try:
-            url = "{}/{}".format(self.catalogs_url,cid)
-            response = R.get(url=url)
-            response.raise_for_status()
-            data = response.json()
-            return Ok(Catalog(**data))
+            catalog, generation = self._cache_get(self._cat_cache, self._cat_gen, cid)
+            if catalog is not None:
+                return Ok(catalog)
+            url = self._cat_tpl % cid
+            response = self._s.get(url=url)
+            err = check_response(response)
+            if err:
+                return Err(err)
+            data = response.content
+            catalog = Catalog.model_validate_json(data)
+            self._cache_set(self._cat_cache, self._cat_gen, cid, catalog, generation)
+            return Ok(catalog)
         except Exception as e:
             return Err(e)
     
     def get_catalogs(self)->Result[List[Catalog],Exception]:
         try:
             # Estampa de tiempo inicial
-            t1 = T.time()
+            t1 = T.perf_counter_ns()
             # Flecha punteada negra
-            response = R.get(url=self.catalogs_url)
+            response = self._s.get(url=self.catalogs_url)
             # Verificador de errores
-            response.raise_for_status()
+            err = check_response(response)
+            if err:
+                return Err(err)
             # Flecha punteda roja
-            data     = response.json()
-
-            catalogs = list(map(lambda x: Catalog(**x), data))
-            t2 = T.time()
-            response_time = t2 - t1
-            log.info({
-                "event":"GET.CATALOGS",
-                "start_time":t1,
-                "end_time":t2,
-                "url":self.catalogs_url,
-                "response_time":response_time
-            })
+            data     = response.content
+
+            catalogs = parse_catalogs(data)
+            t2 = T.perf_counter_ns()
+            # The record is only built when INFO is enabled, the formatter already adds the timestamp
+            if log.isEnabledFor(logging.INFO):
+                log.info({
+                    "event":"GET.CATALOGS",
+                    "url":self.catalogs_url,
+                    "response_time":(t2 - t1)/1e9
+                })
             return Ok(catalogs)
         except Exception as e:
             return Err(e)
     
     def get_products(self,skip:int = 0, limit:int = 10)->Result[List[Product],Exception]:
         try:
-            url = "{}?skip={}&limit={}".format(self.products_url,skip,limit)
-            response = R.get(url=url)
-            response.raise_for_status()
-            data = response.json()
-            products = list(map(lambda x : Product(**x), data))
+            response = self._s.get(url=self.products_url, params={"skip":skip,"limit":limit})
+            err = check_response(response)
+            if err:
+                return Err(err)
+            data = response.content
+            products = parse_products(data)
             return Ok(products)
         except Exception as e:
             return Err(e)
     
+    def iter_products(self,skip:int = 0, limit:int = 10000)->Iterator[Product]:
+        # Yields products while the response is still being read, being a generator it raises on errors instead of returning Err
+        with self._s.get(url=self.products_url, params={"skip":skip,"limit":limit}, stream=True) as response:
+            response.raise_for_status()
+            if ijson is None:
+                yield from parse_products(response.content)
+                return
+            # urllib3 only undoes gzip/deflate on raw reads when asked to
+            response.raw.decode_content = True
+            for obj in ijson.items(response.raw, "item"):
+                yield Product.model_validate(obj)
+
     def query_products(self,obid:str, filter:ProductFilter ,skip:int = 0, limit:int = 100 ):
         try:
-            url = "{}/{}/products/nid".format(self.observatories_url,obid)
-            response = R.post(url=url, json= filter.model_dump())
-            response.raise_for_status()
-            data = response.json()
-            print(data)
-            products = list(map(lambda x : Product(**x), data))
+            url = self._query_tpl % obid
+            response = self._s.post(url=url, data=filter.model_dump_json().encode(), headers=JSON_HEADERS)
+            err = check_response(response)
+            if err:
+                return Err(err)
+            data = response.content
+            products = parse_products(data)
             return Ok(products)
         except Exception as e:
             return Err(e)
     
-    def create_products(self,products:List[Product]=[])->Result[bool, Exception]:
+    def create_products(self,products:Optional[List[Product]]=None)->Result[bool, Exception]:
+        products = [] if products is None else products
         try:
-            _products = list(map(lambda x : x.model_dump(),products))
-            response = R.post(url=self.products_url,json=_products)
-            response.raise_for_status()
+            response = self._s.post(url=self.products_url,data=dump_products(products),headers=JSON_HEADERS)
+            err = check_response(response)
+            if err:
+                return Err(err)
             return Ok(True)
         except Exception as e:
             return Err(e)
     
     def delete_product(self,pid:str)->Result[str,Exception]:
         try:
-            url = "{}/{}".format(self.products_url,pid)
-            response = R.delete(url=url)
-            response.raise_for_status()
+            url = self._prod_tpl % pid
+            response = self._s.delete(url=url)
+            err = check_response(response)
+            if err:
+                return Err(err)
             return Ok(pid)
         except Exception as e:
-            return Err(e)
\ No newline at end of file
+            return Err(e)
+
+    def delete_products_bulk(self, pids:List[str], workers:int=16)->List[Result[str,Exception]]:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.delete_product, pids))
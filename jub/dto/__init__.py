@@ -14,56 +14,121 @@
 # limitations under the License.
 
 import re
-import json as J
-from typing import List,Dict,Optional
-from pydantic import BaseModel,field_validator
+from pathlib import Path
+from functools import lru_cache
+from dataclasses import dataclass, field
+from array import array
+from typing import List,Dict,Optional,Tuple,Annotated,Iterable,Iterator,Union
+from pydantic import BaseModel,TypeAdapter,ConfigDict,Field,StrictInt,AfterValidator,field_validator
+
+def _normalize_ws(value:str)->str:
+    # Collapses whitespace runs into one space and trims the ends, shared by every display_name
+    return " ".join(value.split())
+
+# Schemas are built on first use instead of at import, most programs only touch a few of these models
+_DEFERRED_CONFIG = ConfigDict(defer_build=True)
+# Shared by every response DTO, they are read-only values once validated
+_FROZEN_CONFIG = ConfigDict(extra="ignore", frozen=True, defer_build=True)
+
+# Runs after the str check, so the normalizer always receives a string
+DisplayName = Annotated[str, AfterValidator(_normalize_ws)]
 
 class LevelCatalog(BaseModel):
+    model_config = _FROZEN_CONFIG
     level: int
     cid: str
 
+    def key(self)->Tuple[int,str]:
+        # Plain tuple for sets and dict keys, hashing it is much cheaper than the model's __hash__/__eq__
+        return (self.level, self.cid)
+
 class Observatory(BaseModel):
+    model_config = _FROZEN_CONFIG
     obid:str=""
     title: str="Observatory"
     image_url:str=""
     description:str=""
-    catalogs:List[LevelCatalog]=[]
+    catalogs:List[LevelCatalog] = Field(default_factory=list)
     disabled:bool = False
 
 class CatalogItem(BaseModel):
+    model_config = _FROZEN_CONFIG
     value:str
-    display_name:str
-    code:int
+    display_name:DisplayName
+    # Numeric code of the item inside its catalog, strict so strings like "0032" are rejected instead of coerced
+    code:Annotated[StrictInt, Field(ge=0)]
     description:str
     metadata:Dict[str,str]
 
+@dataclass
+class CatalogItemBatch:
+    # Column store for large sets of catalog items: one list per field and flat metadata keys/values,
+    # the metadata of row i lives in meta_keys[meta_row_offsets[i]:meta_row_offsets[i+1]]
+    value: List[str] = field(default_factory=list)
+    display_name: List[str] = field(default_factory=list)
+    code: array = field(default_factory=lambda: array("q"))
+    description: List[str] = field(default_factory=list)
+    meta_keys: List[str] = field(default_factory=list)
+    meta_vals: List[str] = field(default_factory=list)
+    meta_row_offsets: array = field(default_factory=lambda: array("q", [0]))
+
+    @classmethod
+    def from_items(cls, items:Iterable[Union[CatalogItem, dict]])->'CatalogItemBatch':
+        batch = cls()
+        for item in items:
+            batch.append(item)
+        return batch
+
+    def append(self, item:Union[CatalogItem, dict]):
+        # Dicts are validated one at a time, so only one CatalogItem is alive while the batch is filled
+        if isinstance(item, dict):
+            item = CatalogItem.model_validate(item)
+        # code goes first, it is the only column that can fail (OverflowError past int64), so a bad row adds nothing
+        self.code.append(item.code)
+        self.value.append(item.value)
+        self.display_name.append(item.display_name)
+        self.description.append(item.description)
+        self.meta_keys.extend(item.metadata.keys())
+        self.meta_vals.extend(item.metadata.values())
+        self.meta_row_offsets.append(len(self.meta_keys))
+
+    def __len__(self)->int:
+        return len(self.value)
+
+    def __getitem__(self, i:int)->CatalogItem:
+        # bool is an int subclass, but True/False are not row numbers
+        if not isinstance(i, int) or isinstance(i, bool):
+            raise TypeError("CatalogItemBatch indices must be integers, not {}".format(type(i).__name__))
+        # range normalizes negative indexes and raises IndexError like a list
+        i = range(len(self))[i]
+        lo, hi = self.meta_row_offsets[i], self.meta_row_offsets[i+1]
+        # Every column was filled from a validated item, so the row is rebuilt without validating it again
+        return CatalogItem.model_construct(
+            value        = self.value[i],
+            display_name = self.display_name[i],
+            code         = self.code[i],
+            description  = self.description[i],
+            metadata     = dict(zip(self.meta_keys[lo:hi], self.meta_vals[lo:hi]))
+        )
+
+    def __iter__(self)->Iterator[CatalogItem]:
+        for i in range(len(self)):
+            yield self[i]
+
 class Catalog(BaseModel):
+    model_config = _FROZEN_CONFIG
     cid:str = ""
-    display_name:str = ""
-    items: List[CatalogItem] = []
+    display_name:DisplayName = ""
+    items: List[CatalogItem] = Field(default_factory=list)
     kind:str = ""
-    @field_validator("display_name")
-    def remove_double_spaces(cls,value):
-        x = " ".join(value.split())
-        return x
-    @field_validator("items")
-    def remove_double_spaces_in_items(cls,items):
-        xs = []
-        for item in items:
-            if type(item) ==dict:
-                item = CatalogItem(**item)
-            item.display_name = " ".join(item.display_name.split())
-            xs.append(item)
-        return xs
-    
+
     @staticmethod
     def from_json( path:str)->'Catalog':
-        with open(path,"rb") as f:
-            data = J.loads(f.read())
-            catalog = Catalog(**data)
-            return catalog
+        # pydantic-core parses the bytes straight into the model, no intermediate dict is built
+        return Catalog.model_validate_json(Path(path).read_bytes())
 
 class InequalityFilter(BaseModel):
+    model_config = _DEFERRED_CONFIG
     gt: Optional[int] = None  # Greater than
     lt: Optional[int] = None  # Less than
     eq: Optional[int] = None  # Equal to
@@ -73,6 +138,7 @@ class InequalityFilter(BaseModel):
         return v if v != "" else None
 
 class InterestFilter(BaseModel):
+    model_config = _DEFERRED_CONFIG
     # Allow either a simple value (str) or an inequality filter
     value: Optional[str] = None
     inequality: Optional[InequalityFilter] = None
@@ -87,40 +153,73 @@ class InterestFilter(BaseModel):
         return v
     
 class  TemporalFilter(BaseModel):
+    model_config = _DEFERRED_CONFIG
     low: int
     high: int
 
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern:str)->re.Pattern:
+    return re.compile(pattern)
+
 class SpatialFilter(BaseModel):
+    model_config = _DEFERRED_CONFIG
     country: str
     state: str
     municipality: str
     def make_regex(self):
-        pattern = "^"
-        pattern += re.escape(self.country) if self.country != "*" else ".*"
-        pattern += r"\."
-        pattern += re.escape(self.state) if self.state != "*" else ".*"
-        pattern += r"\."
-        pattern += re.escape(self.municipality) if self.municipality != "*" else ".*"
-        return pattern.upper()
+        parts = [re.escape(x) if x != "*" else ".*" for x in (self.country,self.state,self.municipality)]
+        return ("^" + r"\.".join(parts)).upper()
+
+    @property
+    def compiled(self)->re.Pattern:
+        # Cached on the pattern string, so copies and field assignments never see a stale pattern
+        return _compile_pattern(self.make_regex())
 
 class ProductFilter(BaseModel):
+    model_config = _DEFERRED_CONFIG
     temporal: Optional[TemporalFilter] = None
     spatial: Optional[SpatialFilter] = None
-    interest: List[InterestFilter]=[]
+    interest: List[InterestFilter] = Field(default_factory=list)
 
 class Level(BaseModel):
+    model_config = _FROZEN_CONFIG
     index:int
     cid:str
     value:str
     kind:str =""
 
 class Product(BaseModel):
+    model_config = _FROZEN_CONFIG
     pid:str=""
     description:str=""
-    levels:List[Level]=[]
+    levels:List[Level] = Field(default_factory=list)
     product_type: str=""
     level_path:str=""
     profile:str=""
     product_name: str=""
-    tags:List[str]=[]
+    tags:List[str] = Field(default_factory=list)
     url:str =""
+
+# Lists are validated straight from the response bytes and dumped to JSON bytes with one pydantic-core call per batch
+_OBS_LIST       = TypeAdapter(List[Observatory], config=_DEFERRED_CONFIG)
+_CAT_LIST       = TypeAdapter(List[Catalog], config=_DEFERRED_CONFIG)
+_PROD_LIST      = TypeAdapter(List[Product], config=_DEFERRED_CONFIG)
+_LEVEL_CAT_LIST = TypeAdapter(List[LevelCatalog], config=_DEFERRED_CONFIG)
+
+def parse_observatories(data:Union[str,bytes])->List[Observatory]:
+    return _OBS_LIST.validate_json(data)
+
+def parse_catalogs(data:Union[str,bytes])->List[Catalog]:
+    return _CAT_LIST.validate_json(data)
+
+def parse_products(data:Union[str,bytes])->List[Product]:
+    return _PROD_LIST.validate_json(data)
+
+def parse_level_catalogs(data:Union[str,bytes])->List[LevelCatalog]:
+    return _LEVEL_CAT_LIST.validate_json(data)
+
+def dump_products(products:List[Product])->bytes:
+    return _PROD_LIST.dump_json(products)
+
+def dump_level_catalogs(catalogs:List[LevelCatalog])->bytes:
+    return _LEVEL_CAT_LIST.dump_json(catalogs)
@@ -0,0 +1,85 @@
+# Copyright 2026 MADTEC-2025-M-478 Project Team
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     [http://www.apache.org/licenses/LICENSE-2.0](http://www.apache.org/licenses/LICENSE-2.0)
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import secrets
+from typing import Optional
+from requests import Response
+from requests.exceptions import HTTPError
+import jub.config as CX
+from jub.dto import Observatory
+try:
+    import aiohttp
+except ImportError:
+    # Only AsyncJubClient needs it, through the optional "async" extra
+    aiohttp = None
+
+# Request bodies are serialized before calling the session, so the content type must be set explicitly
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Sent when an observatory is created without an image, the server rejects an empty image_url
+DEFAULT_OBSERVATORY_IMAGE_URL = "https://ivoice.live/wp-content/uploads/2019/12/no-image-1.jpg"
+
+_ID_ALPHABET = CX.JUB_CLIENT_OBSERVATORY_ID_ALPHABET
+_ID_SIZE     = CX.JUB_CLIENT_OBSERVATORY_ID_SIZE
+
+def gen_id(size:int=_ID_SIZE, alphabet:str=_ID_ALPHABET)->str:
+    n = len(alphabet)
+    if n == 0 or n > 256:
+        raise ValueError("gen_id alphabet must have between 1 and 256 symbols, got {}".format(n))
+    # Random bytes at or above this bound are discarded so every symbol of the alphabet is equally likely
+    bound = 256 - (256 % n)
+    _id   = ""
+    # Twice the needed bytes is almost always enough, so this is a single call to the OS random source
+    while len(_id) < size:
+        _id += "".join([alphabet[b % n] for b in secrets.token_bytes(size*2) if b < bound])
+    return _id[:size]
+
+def with_observatory_defaults(observatory:Observatory)->Observatory:
+    # Observatories are frozen, so the server side defaults for image_url and obid go into a copy
+    defaults = {}
+    if observatory.image_url == "":
+        defaults["image_url"] = DEFAULT_OBSERVATORY_IMAGE_URL
+    if observatory.obid == "":
+        defaults["obid"] = gen_id()
+    return observatory.model_copy(update=defaults) if defaults else observatory
+
+class JubEndpoints(object):
+    # Base of JubClient and AsyncJubClient, item URLs only differ by the trailing id so they are built from templates
+    def __init__(self,hostname:str, port:int=-1):
+        self.base_url = "https://{}".format(hostname) if port == -1 else "http://{}:{}".format(hostname,port)
+        self.observatories_url = "{}/observatories".format(self.base_url)
+        self.catalogs_url = "{}/catalogs".format(self.base_url)
+        self.products_url = "{}/products".format(self.base_url)
+        self._obs_tpl   = self.observatories_url + "/%s"
+        self._cat_tpl   = self.catalogs_url + "/%s"
+        self._prod_tpl  = self.products_url + "/%s"
+        self._query_tpl = self.observatories_url + "/%s/products/nid"
+
+def check_response(response:Response)->Optional[HTTPError]:
+    # Builds the error without raising it, so failed responses skip the traceback capture of raise_for_status
+    if response.ok:
+        return None
+    return HTTPError("{} {} for url: {}".format(response.status_code, response.reason, response.url), response=response)
+
+def check_async_response(response:'aiohttp.ClientResponse')->Optional['aiohttp.ClientResponseError']:
+    # Same as check_response for aiohttp responses
+    if response.ok:
+        return None
+    return aiohttp.ClientResponseError(
+        response.request_info,
+        response.history,
+        status  = response.status,
+        message = response.reason,
+        headers = response.headers
+    )
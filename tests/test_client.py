@@ -1,6 +1,8 @@
+import asyncio
+import threading
 import pytest
 from jub import JubClient
-from jub.dto import Observatory
+from jub.dto import Observatory, Product, LevelCatalog, parse_level_catalogs
 
 
 @pytest.fixture
@@ -45,4 +47,113 @@ def test_create_observatory(client):
     remote_obs = observatory_result.unwrap()
     assert remote_obs.title == local_obs.title
     assert remote_obs.description == local_obs.description
-    # assert remote_obs.name
\ No newline at end of file
+    # assert remote_obs.name
+
+def test_client_context_manager():
+    with JubClient(hostname="localhost", port=5000) as client:
+        result = client.get_catalogs()
+        assert result.is_ok
+
+def test_async_delete_products(client):
+    pytest.importorskip("aiohttp")
+    from jub.async_client import AsyncJubClient
+    products = [Product(pid="async-test-{}".format(i)) for i in range(10)]
+    assert client.create_products(products=products).is_ok
+
+    async def delete_all():
+        async with AsyncJubClient(hostname="localhost", port=5000) as async_client:
+            return await async_client.delete_products(pids=[p.pid for p in products])
+
+    results = asyncio.run(delete_all())
+    assert all(result.is_ok for result in results)
+
+def test_bulk_create_observatories_and_delete_products(client):
+    observatories = [Observatory(title="Bulk Observatory {}".format(i)) for i in range(10)]
+    results = client.create_observatories_bulk(observatories=observatories)
+    assert all(result.is_ok for result in results)
+    obids = [result.unwrap() for result in results]
+
+    products = [Product(pid="bulk-test-{}".format(i)) for i in range(10)]
+    assert client.create_products(products=products).is_ok
+    results = client.delete_products_bulk(pids=[p.pid for p in products])
+    assert all(result.is_ok for result in results)
+    assert all(client.delete_observatory(obid=obid).is_ok for obid in obids)
+
+def test_get_observatory_cache_is_invalidated_on_delete(client):
+    obid = client.create_observatory(observatory=Observatory(title="Cached Observatory")).unwrap()
+    first  = client.get_observatory(obid=obid).unwrap()
+    second = client.get_observatory(obid=obid).unwrap()
+    assert first is second
+
+    assert client.delete_observatory(obid=obid).is_ok
+    assert client.get_observatory(obid=obid).is_err
+
+def test_iter_products(client):
+    products = [Product(pid="iter-test-{}".format(i), tags=["a", "b"]) for i in range(10)]
+    assert client.create_products(products=products).is_ok
+
+    streamed = list(client.iter_products(skip=0, limit=10000))
+    assert all(isinstance(p, Product) for p in streamed)
+    assert set(p.pid for p in products) <= set(p.pid for p in streamed)
+    assert all(result.is_ok for result in client.delete_products_bulk(pids=[p.pid for p in products]))
+
+def test_async_client_requires_context_manager():
+    pytest.importorskip("aiohttp")
+    from jub.async_client import AsyncJubClient
+
+    async_client = AsyncJubClient(hostname="localhost", port=5000)
+    with pytest.raises(RuntimeError):
+        asyncio.run(async_client.get_catalogs())
+    with pytest.raises(RuntimeError):
+        asyncio.run(async_client.delete_products(pids=["x"]))
+
+class _FakeResponse(object):
+    def __init__(self, body:bytes, wait:threading.Event=None):
+        self.ok          = True
+        self.status_code = 200
+        self.reason      = "OK"
+        self.url         = ""
+        self._body       = body
+        self._wait       = wait
+
+    @property
+    def content(self)->bytes:
+        # Holds the reader after it received the body, the same as a slow validation would
+        if self._wait is not None:
+            self._wait.wait(timeout=5)
+        return self._body
+
+class _FakeSession(object):
+    def __init__(self, observatory:Observatory):
+        self.observatory  = observatory
+        self.read_started = threading.Event()
+        self.write_done   = threading.Event()
+        self.slow_reads   = True
+
+    def get(self, url, **kwargs):
+        body = self.observatory.model_dump_json().encode()
+        if self.slow_reads:
+            self.slow_reads = False
+            self.read_started.set()
+            return _FakeResponse(body, wait=self.write_done)
+        return _FakeResponse(body)
+
+    def post(self, url, data, **kwargs):
+        self.observatory = self.observatory.model_copy(update={"catalogs": parse_level_catalogs(data)})
+        return _FakeResponse(b"")
+
+def test_get_observatory_racing_a_write_does_not_cache_the_old_value():
+    client = JubClient(hostname="localhost", port=5000)
+    session = _FakeSession(Observatory(obid="race", title="Race"))
+    client._s = session
+
+    reader = threading.Thread(target=client.get_observatory, kwargs={"obid": "race"})
+    reader.start()
+    assert session.read_started.wait(timeout=5)
+    # The reader already holds the old body, the write runs to completion before it caches anything
+    assert client.update_observatory_catalogs(obid="race", catalogs=[LevelCatalog(level=9, cid="new")]).is_ok
+    session.write_done.set()
+    reader.join(timeout=5)
+
+    observatory = client.get_observatory(obid="race").unwrap()
+    assert observatory.catalogs == [LevelCatalog(level=9, cid="new")]
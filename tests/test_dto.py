@@ -0,0 +1,52 @@
+import pytest
+from pydantic import ValidationError
+from jub.dto import SpatialFilter, CatalogItem, CatalogItemBatch
+
+
+def test_spatial_filter_compiled_follows_field_changes():
+    spatial = SpatialFilter(country="MX", state="*", municipality="A.B")
+    assert spatial.compiled.pattern == spatial.make_regex()
+
+    copied = spatial.model_copy(update={"country": "US"})
+    assert copied.compiled.pattern.startswith(r"^US\.")
+    assert spatial.compiled.pattern.startswith(r"^MX\.")
+
+    spatial.state = "JAL"
+    assert spatial.compiled.pattern == spatial.make_regex()
+    assert spatial.compiled.match("MX.JAL.A.B")
+
+def test_catalog_item_batch_round_trip():
+    items = [
+        CatalogItem(value="a", display_name="A  item", code=1, description="first", metadata={"k": "v", "x": "y"}),
+        CatalogItem(value="b", display_name="B", code=2, description="second", metadata={}),
+        CatalogItem(value="c", display_name="C", code=3, description="third", metadata={"z": "w"}),
+    ]
+    batch = CatalogItemBatch.from_items([items[0], items[1].model_dump(), items[2]])
+    assert len(batch) == 3
+    assert list(batch) == items
+    assert batch[1].metadata == {}
+    assert batch[-1] == items[2]
+    assert batch[-3] == items[0]
+    with pytest.raises(IndexError):
+        batch[3]
+    with pytest.raises(TypeError):
+        batch[0:2]
+    with pytest.raises(TypeError):
+        batch[True]
+
+def test_catalog_item_batch_from_items_builds_the_subclass():
+    class Batch(CatalogItemBatch):
+        pass
+    batch = Batch.from_items([CatalogItem(value="a", display_name="A", code=1, description="", metadata={})])
+    assert type(batch) is Batch
+
+def test_catalog_item_batch_rejects_bad_rows_atomically():
+    batch = CatalogItemBatch.from_items([CatalogItem(value="a", display_name="A", code=1, description="", metadata={"k": "v"})])
+    with pytest.raises(OverflowError):
+        batch.append(CatalogItem(value="b", display_name="B", code=2**63, description="", metadata={"x": "y"}))
+    with pytest.raises(ValidationError):
+        batch.append({"value": "c", "display_name": "C", "code": "3", "description": "", "metadata": {}})
+    assert len(batch) == 1
+    assert len(batch.code) == 1
+    assert list(batch.meta_row_offsets) == [0, 1]
+    assert batch[0].metadata == {"k": "v"}
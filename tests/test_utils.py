@@ -0,0 +1,35 @@
+from collections import Counter
+import pytest
+from jub.utils import gen_id, with_observatory_defaults, DEFAULT_OBSERVATORY_IMAGE_URL
+from jub.dto import Observatory
+import jub.config as CX
+
+
+def test_gen_id_uses_the_default_alphabet_and_size():
+    _id = gen_id()
+    assert len(_id) == CX.JUB_CLIENT_OBSERVATORY_ID_SIZE
+    assert set(_id) <= set(CX.JUB_CLIENT_OBSERVATORY_ID_ALPHABET)
+
+def test_gen_id_is_uniform_over_a_custom_alphabet():
+    counts = Counter(gen_id(size=1_000_000, alphabet="0123456789"))
+    assert set(counts) == set("0123456789")
+    # 100k expected per digit with a stddev close to 300, a fixed 36 symbol bound puts '0' and '1' ~4000 above the rest
+    assert max(counts.values()) - min(counts.values()) < 2_500
+
+def test_gen_id_emits_every_symbol_of_a_256_symbol_alphabet():
+    alphabet = "".join(chr(0x100 + i) for i in range(256))
+    assert set(gen_id(size=20_000, alphabet=alphabet)) == set(alphabet)
+
+def test_gen_id_rejects_alphabets_longer_than_a_byte():
+    with pytest.raises(ValueError):
+        gen_id(alphabet="".join(chr(0x100 + i) for i in range(257)))
+
+def test_with_observatory_defaults_fills_a_copy():
+    observatory = Observatory(title="Defaults")
+    filled = with_observatory_defaults(observatory)
+    assert filled.image_url == DEFAULT_OBSERVATORY_IMAGE_URL
+    assert len(filled.obid) == CX.JUB_CLIENT_OBSERVATORY_ID_SIZE
+    assert observatory.obid == "" and observatory.image_url == ""
+
+    complete = Observatory(obid="abc", image_url="https://example.com/x.png")
+    assert with_observatory_defaults(complete) is complete